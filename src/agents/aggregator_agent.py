@@ -6,6 +6,7 @@ multiple specialist medical opinions into a coherent, patient-friendly response.
 """
 
 import json
+import re
 import asyncio
 from typing import List, Dict, Optional, AsyncGenerator, Any
 from dataclasses import dataclass
@@ -19,6 +20,10 @@ from src.prompts import get_agent_prompt
 # Initialize OpenAI client
 client = AsyncOpenAI(api_key=settings.openai_api_key)
 
+# Keyword patterns used to classify lines of the aggregated response
+_RECOMMENDATION_RE = re.compile(r"recommend|suggest|should", re.IGNORECASE)
+_NEXT_STEP_RE = re.compile(r"next|follow|schedule", re.IGNORECASE)
+
 
 @dataclass
 class AggregatedResponse:
@@ -330,9 +335,9 @@ REQUESTED TESTS:
         
         for line in lines:
             line = line.strip()
-            if any(keyword in line.lower() for keyword in ["recommend", "suggest", "should"]):
+            if _RECOMMENDATION_RE.search(line):
                 primary_recommendations.append(line)
-            elif any(keyword in line.lower() for keyword in ["next", "follow", "schedule"]):
+            elif _NEXT_STEP_RE.search(line):
                 next_steps.append(line)
         
         # Identify consensus areas (simplified)
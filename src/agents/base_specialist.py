@@ -13,6 +13,7 @@ from __future__ import annotations
 import json
 import asyncio
 import time
+from itertools import islice
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, AsyncGenerator, Any
 from dataclasses import dataclass
@@ -240,7 +241,7 @@ class BaseSpecialist(ABC):
                 
                 # Execute each tool call
                 for tool_call in message.tool_calls:
-                    start_time = time.time()
+                    start_time = time.perf_counter()
                     
                     result = await self._execute_tool(
                         patient_id,
@@ -248,7 +249,7 @@ class BaseSpecialist(ABC):
                         json.loads(tool_call.function.arguments)
                     )
                     
-                    execution_time = time.time() - start_time
+                    execution_time = time.perf_counter() - start_time
                     
                     # Store tool call for tracking
                     tool_calls.append(ToolCall(
@@ -421,14 +422,14 @@ class BaseSpecialist(ABC):
             history = context["medical_history"]
             if isinstance(history, list) and history:
                 # Show chronic conditions first (up to 3)
-                chronic_conditions = [h for h in history if h.get('source') == 'document_extraction'][:3]
+                chronic_conditions = list(islice((h for h in history if h.get('source') == 'document_extraction'), 3))
                 if chronic_conditions:
                     context_parts.append("Known Medical Conditions:")
                     for condition in chronic_conditions:
                         context_parts.append(f"- {condition.get('condition', 'Unknown')} ({condition.get('body_part', 'General')}) - {condition.get('severity', 'Unknown severity')}")
                 
                 # Show recent medical events (up to 5)
-                recent_events = [h for h in history if h.get('source') != 'document_extraction'][:5]
+                recent_events = list(islice((h for h in history if h.get('source') != 'document_extraction'), 5))
                 if recent_events:
                     context_parts.append("Recent Medical History:")
                     for record in recent_events:
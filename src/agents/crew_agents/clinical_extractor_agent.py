@@ -15,6 +15,10 @@ from pydantic import BaseModel, Field
 from src.utils.logging import logger
 from src.config.body_parts import get_default_body_parts
 
+# Severity cue patterns applied to the context around each injury match
+_SEVERE_RE = re.compile(r"severe|critical|major", re.IGNORECASE)
+_MILD_RE = re.compile(r"mild|minor|slight", re.IGNORECASE)
+
 
 class MedicalEvent(BaseModel):
     """Model for medical events/findings."""
@@ -223,9 +227,9 @@ class MedicalExtractionTool(BaseTool):
                     
                     # Extract severity
                     severity = "moderate"
-                    if any(word in context.lower() for word in ["severe", "critical", "major"]):
+                    if _SEVERE_RE.search(context):
                         severity = "severe"
-                    elif any(word in context.lower() for word in ["mild", "minor", "slight"]):
+                    elif _MILD_RE.search(context):
                         severity = "mild"
                     
                     # Extract date
@@ -16,8 +16,8 @@ import asyncio
 
 from src.config.settings import settings
 from src.utils.logging import logger, log_user_action
-from src.agents.expert_router import get_expert_router
-from src.agents.aggregator_agent import get_aggregator
+from src.agents.expert_router import ExpertRouter, get_expert_router
+from src.agents.aggregator_agent import AggregatorAgent, get_aggregator
 from src.chat.short_term import get_short_term_memory
 from src.chat.long_term import get_long_term_memory
 from src.db.redis_db import get_redis
@@ -36,11 +36,31 @@ class OrchestratorAgent:
     4. Streams results back to user
     """
 
-    def __init__(self):
-        """Initialize the orchestrator with system prompt."""
+    def __init__(
+        self,
+        expert_router: Optional[ExpertRouter] = None,
+        aggregator: Optional[AggregatorAgent] = None
+    ):
+        """
+        Initialize the orchestrator with system prompt.
+        
+        Args:
+            expert_router: Optional router to use instead of the global instance
+            aggregator: Optional aggregator to use instead of the global instance
+        """
         self.system_prompt = self._get_system_prompt()
         self.model = settings.openai_model_chat
         self.session_contexts = {}  # Cache for session contexts
+        self.expert_router = expert_router
+        self.aggregator = aggregator
+    
+    async def _get_router(self) -> ExpertRouter:
+        """Get the injected expert router, falling back to the global one."""
+        return self.expert_router or await get_expert_router()
+    
+    async def _get_aggregator(self) -> AggregatorAgent:
+        """Get the injected aggregator, falling back to the global one."""
+        return self.aggregator or await get_aggregator()
     
     def _get_system_prompt(self) -> str:
         """Get the orchestrator system prompt."""
@@ -76,7 +96,7 @@ Available functions: cardiologist(query), neurologist(query), orthopedist(query)
             context = await self._get_conversation_context(patient_id, session_id)
             
             # Route to appropriate specialists
-            router = await get_expert_router()
+            router = await self._get_router()
             specialists = await router.select_specialists(message, context)
             
             logger.info(f"Selected specialists: {[s['type'] for s in specialists]}")
@@ -103,7 +123,7 @@ Available functions: cardiologist(query), neurologist(query), orthopedist(query)
             specialist_responses = [r for r in results if r is not None]
             
             # Aggregate responses
-            aggregator = await get_aggregator()
+            aggregator = await self._get_aggregator()
             final_response = await aggregator.synthesize_response(
                 user_query=message,
                 specialist_responses=specialist_responses,
@@ -158,7 +178,7 @@ Available functions: cardiologist(query), neurologist(query), orthopedist(query)
                 "content": "Selecting medical specialists..."
             }
             
-            router = await get_expert_router()
+            router = await self._get_router()
             specialists = await router.select_specialists(message, context)
             
             specialist_names = [s['type'].replace('_', ' ').title() for s in specialists]
@@ -214,7 +234,7 @@ Available functions: cardiologist(query), neurologist(query), orthopedist(query)
                 "content": "Synthesizing medical insights..."
             }
             
-            aggregator = await get_aggregator()
+            aggregator = await self._get_aggregator()
             
             # Stream aggregated response
             async for chunk in aggregator.stream_synthesis(
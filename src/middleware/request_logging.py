@@ -31,14 +31,14 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             return await call_next(request)
         
         # Record start time
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Process request
         try:
             response = await call_next(request)
             
             # Calculate duration
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
             
             # Log request details
             log_request(request, response, duration)
@@ -47,7 +47,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             
         except Exception as e:
             # Log failed requests
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
             logger.error(
                 "Request failed: %s %s | Duration: %.2fms | Error: %s",
                 request.method,
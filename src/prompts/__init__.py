@@ -9,6 +9,9 @@ import json
 import os
 from pathlib import Path
 from typing import Dict, Any, Optional
+
+import orjson
+
 from src.utils.logging import logger
 
 
@@ -42,14 +45,14 @@ class PromptManager:
             raise FileNotFoundError(f"Prompt file not found: {prompt_file}")
         
         try:
-            with open(prompt_file, 'r', encoding='utf-8') as f:
-                prompt_data = json.load(f)
+            with open(prompt_file, 'rb') as f:
+                prompt_data = orjson.loads(f.read())
             
             self._cache[prompt_name] = prompt_data
             logger.info(f"Loaded prompt: {prompt_name}")
             return prompt_data
             
-        except json.JSONDecodeError as e:
+        except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses it
             logger.error(f"Invalid JSON in prompt file {prompt_file}: {e}")
             raise
         except Exception as e:
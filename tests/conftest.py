@@ -5,8 +5,21 @@ Test configuration and fixtures for MediTwin Backend tests.
 import pytest
 import asyncio
 import os
+import sys
 from typing import AsyncGenerator
 from unittest.mock import AsyncMock, MagicMock
+
+# Stub the database drivers before anything imports `src`, so collection does
+# not pay for importing motor, neo4j and pymilvus. Tests only ever talk to
+# mocked clients.
+for _driver in ("motor.motor_asyncio", "neo4j", "neo4j.exceptions", "pymilvus"):
+    sys.modules[_driver] = MagicMock()
+
+try:
+    import uvloop
+except ImportError:  # not available on Windows
+    uvloop = None
+
 from httpx import AsyncClient
 from fastapi.testclient import TestClient
 
@@ -14,12 +27,11 @@ from src.main import app
 from src.config.settings import settings
 
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+def pytest_asyncio_loop_factories(config, item):
+    """Create event loops with uvloop where it is installed; plain asyncio otherwise."""
+    if uvloop is None:
+        return {"asyncio": asyncio.new_event_loop}
+    return {"uvloop": uvloop.new_event_loop}
 
 
 @pytest.fixture
@@ -1,7 +1,6 @@
 """
 Integration tests for MediTwin Backend.
 """
-import pytest
 import asyncio
 from httpx import AsyncClient
 from fastapi.testclient import TestClient
@@ -50,7 +49,6 @@ class TestAPIDocumentation:
             assert response.status_code == 200
 
 
-@pytest.mark.asyncio
 class TestAsyncEndpoints:
     """Integration tests for async endpoints."""
 
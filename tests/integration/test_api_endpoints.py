@@ -2,7 +2,6 @@
 Integration tests for the MediTwin backend API endpoints.
 """
 
-import pytest
 from httpx import AsyncClient
 from unittest.mock import AsyncMock, patch, MagicMock
 import json
@@ -14,7 +13,6 @@ from src.main import app
 class TestTimelineEndpoints:
     """Integration tests for timeline endpoints."""
     
-    @pytest.mark.asyncio
     async def test_get_timeline_success(self):
         """Test successful timeline retrieval."""
         mock_mongo_events = [
@@ -60,7 +58,6 @@ class TestTimelineEndpoints:
                     assert "total_count" in data
                     assert len(data["events"]) == 2
     
-    @pytest.mark.asyncio
     async def test_create_timeline_event_success(self):
         """Test successful timeline event creation."""
         with patch('src.db.mongo_db.get_mongo') as mock_get_mongo:
@@ -86,7 +83,6 @@ class TestTimelineEndpoints:
                     assert data["event_id"] == "event_123"
                     assert "message" in data
     
-    @pytest.mark.asyncio
     async def test_update_timeline_event_success(self):
         """Test successful timeline event update."""
         existing_event = {
@@ -113,7 +109,6 @@ class TestTimelineEndpoints:
                 assert data["event_id"] == "event_123"
                 assert "updated_fields" in data
     
-    @pytest.mark.asyncio
     async def test_delete_timeline_event_success(self):
         """Test successful timeline event deletion."""
         existing_event = {
@@ -134,7 +129,6 @@ class TestTimelineEndpoints:
                 data = response.json()
                 assert data["event_id"] == "event_123"
     
-    @pytest.mark.asyncio
     async def test_get_timeline_summary(self):
         """Test timeline summary endpoint."""
         mock_events = [
@@ -164,7 +158,6 @@ class TestTimelineEndpoints:
                 assert "event_types" in data
                 assert "severity_distribution" in data
     
-    @pytest.mark.asyncio
     async def test_search_timeline_events(self):
         """Test timeline search endpoint."""
         mock_events = [
@@ -195,7 +188,6 @@ class TestTimelineEndpoints:
 class TestChatEndpoints:
     """Integration tests for chat endpoints."""
     
-    @pytest.mark.asyncio
     async def test_chat_endpoint_success(self):
         """Test successful chat interaction."""
         with patch('src.agents.orchestrator_agent.get_orchestrator') as mock_get_orchestrator:
@@ -222,7 +214,6 @@ class TestChatEndpoints:
                 assert "confidence" in data
                 assert "sources" in data
     
-    @pytest.mark.asyncio
     async def test_chat_history_endpoint(self):
         """Test chat history retrieval."""
         mock_history = [
@@ -255,7 +246,6 @@ class TestChatEndpoints:
 class TestUploadEndpoints:
     """Integration tests for upload endpoints."""
     
-    @pytest.mark.asyncio
     async def test_upload_document_success(self):
         """Test successful document upload."""
         with patch('src.agents.ingestion_agent.get_ingestion_agent') as mock_get_ingestion:
@@ -282,7 +272,6 @@ class TestUploadEndpoints:
                 assert "document_id" in data
                 assert "status" in data
     
-    @pytest.mark.asyncio
     async def test_upload_status_endpoint(self):
         """Test upload status checking."""
         mock_status = {
@@ -309,7 +298,6 @@ class TestUploadEndpoints:
 class TestHealthEndpoints:
     """Integration tests for health check endpoints."""
     
-    @pytest.mark.asyncio
     async def test_health_check_basic(self):
         """Test basic health check endpoint."""
         async with AsyncClient(app=app, base_url="http://test") as client:
@@ -320,7 +308,6 @@ class TestHealthEndpoints:
             assert data["status"] == "healthy"
             assert data["service"] == "MediTwin Backend"
     
-    @pytest.mark.asyncio 
     async def test_detailed_health_check(self):
         """Test detailed health check endpoint."""
         async with AsyncClient(app=app, base_url="http://test") as client:
@@ -336,7 +323,6 @@ class TestHealthEndpoints:
 class TestErrorHandling:
     """Integration tests for error handling."""
     
-    @pytest.mark.asyncio
     async def test_timeline_user_isolation(self):
         """Test that users can only access their own timeline data."""
         with patch('src.db.mongo_db.get_mongo') as mock_get_mongo:
@@ -352,7 +338,6 @@ class TestErrorHandling:
                 data = response.json()
                 assert len(data["events"]) == 0
     
-    @pytest.mark.asyncio
     async def test_invalid_user_id_format(self):
         """Test handling of invalid user ID format."""
         async with AsyncClient(app=app, base_url="http://test") as client:
@@ -360,7 +345,6 @@ class TestErrorHandling:
             
             assert response.status_code == 422  # Validation error
     
-    @pytest.mark.asyncio
     async def test_timeline_event_not_found(self):
         """Test 404 response for non-existent timeline event."""
         with patch('src.db.mongo_db.get_mongo') as mock_get_mongo:
@@ -373,7 +357,6 @@ class TestErrorHandling:
                 
                 assert response.status_code == 404
     
-    @pytest.mark.asyncio
     async def test_database_connection_error(self):
         """Test handling of database connection errors."""
         with patch('src.db.mongo_db.get_mongo') as mock_get_mongo:
@@ -0,0 +1,113 @@
+"""
+Shared fixtures for unit tests.
+"""
+
+import sys
+from itertools import count
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.agents.cardiologist_agent import CardiologistAgent
+from src.agents.neurologist_agent import NeurologistAgent
+from src.agents.orchestrator_agent import OrchestratorAgent
+from src.agents.ingestion_agent import IngestionAgent
+from src.db.mongo_db import MongoDB
+from src.prompts import PromptManager
+
+
+@pytest.fixture(scope="module")
+def cardiologist_agent():
+    """CardiologistAgent built once per test module."""
+    return CardiologistAgent()
+
+
+@pytest.fixture(scope="module")
+def neurologist_agent():
+    """NeurologistAgent built once per test module."""
+    return NeurologistAgent()
+
+
+@pytest.fixture(scope="module")
+def orchestrator_agent():
+    """OrchestratorAgent built once per test module."""
+    return OrchestratorAgent()
+
+
+@pytest.fixture(scope="module")
+def ingestion_agent():
+    """IngestionAgent built once per test module."""
+    return IngestionAgent()
+
+
+@pytest.fixture(scope="session")
+def prompt_manager():
+    """PromptManager shared by the whole session; tests clear its cache."""
+    return PromptManager()
+
+
+@pytest.fixture(scope="session")
+def prompts_root(tmp_path_factory):
+    """Scratch prompts directory shared by the file-backed prompt tests."""
+    return tmp_path_factory.mktemp("prompts")
+
+
+_object_ids = count(1)
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _stub_objectid():
+    """Replace bson.ObjectId in the Mongo layer with a cheap, predictable id."""
+    # src.db re-exports an instance named mongo_db, so patch the module object.
+    mongo_module = sys.modules[MongoDB.__module__]
+    with patch.object(mongo_module, "ObjectId", side_effect=lambda *_args: f"oid_{next(_object_ids)}"):
+        yield
+
+
+@pytest.fixture(scope="session")
+def frozen_iso():
+    """Fixed ISO-8601 timestamp for test payloads."""
+    return "2024-01-01T00:00:00"
+
+
+def _make_mongo_db():
+    """Build a Motor database stub with only the collections the tests touch."""
+    return SimpleNamespace(
+        medical_records=SimpleNamespace(insert_one=AsyncMock(), find=MagicMock()),
+        timeline_events=SimpleNamespace(insert_one=AsyncMock(), find=MagicMock()),
+    )
+
+
+def _make_redis_client():
+    """Build a Redis client stub; RedisDB drives a synchronous redis client."""
+    return SimpleNamespace(
+        lpush=MagicMock(),
+        expire=MagicMock(),
+        ltrim=MagicMock(),
+        lrange=MagicMock(return_value=[]),
+        setex=MagicMock(),
+        get=MagicMock(return_value=None),
+    )
+
+
+@pytest.fixture
+def db_manager(request, monkeypatch):
+    """Fresh DB manager of the test class's `manager_class`, with user-id hashing stubbed."""
+    # The managers' constructors only set a few unconnected fields, so a new
+    # instance per test is cheaper than sharing one and resetting it.
+    manager = request.cls.manager_class()
+    monkeypatch.setattr(manager, "_hash_user_id", lambda _uid: "hashed_id")
+    return manager
+
+
+@pytest.fixture
+def mongo_db():
+    """Fresh MongoDB database stub."""
+    return _make_mongo_db()
+
+
+@pytest.fixture
+def redis_client():
+    """Fresh Redis client stub."""
+    return _make_redis_client()
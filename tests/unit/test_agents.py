@@ -1,214 +1,237 @@
 """
 Unit tests for agent functionality.
 """
+import sys
+
 import pytest
-from unittest.mock import AsyncMock, patch, MagicMock
+from unittest.mock import AsyncMock, MagicMock, create_autospec
 
-from src.agents.cardiologist_agent import CardiologistAgent
-from src.agents.neurologist_agent import NeurologistAgent
+from src.agents.expert_router import ExpertRouter
+from src.agents.aggregator_agent import AggregatorAgent
 from src.agents.orchestrator_agent import OrchestratorAgent
 from src.agents.ingestion_agent import IngestionAgent
 
 
-class TestCardiologistAgent:
-    """Test cases for CardiologistAgent."""
+CARDIO_RESPONSE = {"summary": "Heart looks normal", "confidence": 8, "sources": ["ECG"]}
+NEURO_RESPONSE = {"summary": "No neurological issues", "confidence": 7, "sources": ["MRI"]}
+AGGREGATED_RESPONSE = {"content": "Overall healthy", "metadata": {"sources": ["ECG", "MRI"]}}
+
+SPECIALISTS = [
+    ("cardiologist_agent", "cardiologist", "cardiology"),
+    ("neurologist_agent", "neurologist", "neurology"),
+]
+
+FALLBACK_PROMPT_MARKERS = {
+    "cardiologist": ("Cardiologist Agent", "heart and circulatory system expert"),
+    "neurologist": ("Neurologist Agent", "brain and nervous system specialist"),
+}
+
+
+class TestSpecialistAgent:
+    """Test cases shared by all specialist agents."""
 
-    def test_init(self):
-        """Test CardiologistAgent initialization."""
-        agent = CardiologistAgent()
-        assert agent.specialty_type.value == "cardiology"
+    @pytest.mark.parametrize("agent_fixture,prompt_name,specialty", SPECIALISTS)
+    def test_init(self, request, agent_fixture, prompt_name, specialty):
+        """Test specialist agent initialization."""
+        agent = request.getfixturevalue(agent_fixture)
+        assert agent.specialty.value == specialty
         assert agent.system_prompt is not None
 
-    @patch('src.agents.cardiologist_agent.get_agent_prompt')
-    def test_get_specialty_prompt(self, mock_get_prompt):
+    @pytest.mark.parametrize("agent_fixture,prompt_name,specialty", SPECIALISTS)
+    def test_get_specialty_prompt(self, request, mocker, agent_fixture, prompt_name, specialty):
         """Test specialty prompt retrieval."""
-        mock_get_prompt.return_value = "Test cardiologist prompt"
+        agent = request.getfixturevalue(agent_fixture)
+        # Patch the agent's own module; `src.agents.<name>_agent` resolves to the
+        # re-exported instance rather than the module.
+        mock_get_prompt = mocker.patch.object(
+            sys.modules[type(agent).__module__],
+            "get_agent_prompt",
+            return_value=f"Test {prompt_name} prompt"
+        )
         
-        agent = CardiologistAgent()
         prompt = agent.get_specialty_prompt()
         
-        assert prompt == "Test cardiologist prompt"
-        mock_get_prompt.assert_called_once_with("cardiologist")
+        assert prompt == f"Test {prompt_name} prompt"
+        mock_get_prompt.assert_called_once_with(prompt_name)
 
-    @patch('src.agents.cardiologist_agent.get_agent_prompt')
-    def test_get_specialty_prompt_fallback(self, mock_get_prompt):
+    @pytest.mark.parametrize("agent_fixture,prompt_name,specialty", SPECIALISTS)
+    def test_get_specialty_prompt_fallback(self, request, mocker, agent_fixture, prompt_name, specialty):
         """Test specialty prompt fallback on error."""
-        mock_get_prompt.side_effect = Exception("Test error")
+        agent = request.getfixturevalue(agent_fixture)
+        mocker.patch.object(
+            sys.modules[type(agent).__module__],
+            "get_agent_prompt",
+            side_effect=Exception("Test error")
+        )
         
-        agent = CardiologistAgent()
         prompt = agent.get_specialty_prompt()
         
-        assert "Cardiologist Agent" in prompt
-        assert "heart and circulatory system expert" in prompt
-
-
-class TestNeurologistAgent:
-    """Test cases for NeurologistAgent."""
-
-    def test_init(self):
-        """Test NeurologistAgent initialization."""
-        agent = NeurologistAgent()
-        assert agent.specialty_type.value == "neurology"
-        assert agent.system_prompt is not None
-
-    @patch('src.agents.neurologist_agent.get_agent_prompt')
-    def test_get_specialty_prompt(self, mock_get_prompt):
-        """Test specialty prompt retrieval."""
-        mock_get_prompt.return_value = "Test neurologist prompt"
-        
-        agent = NeurologistAgent()
-        prompt = agent.get_specialty_prompt()
-        
-        assert prompt == "Test neurologist prompt"
-        mock_get_prompt.assert_called_once_with("neurologist")
+        for marker in FALLBACK_PROMPT_MARKERS[prompt_name]:
+            assert marker in prompt
 
 
 class TestOrchestratorAgent:
     """Test cases for OrchestratorAgent."""
 
-    def test_init(self):
+    def test_init(self, orchestrator_agent):
         """Test OrchestratorAgent initialization."""
-        agent = OrchestratorAgent()
-        assert hasattr(agent, 'cardiologist')
-        assert hasattr(agent, 'neurologist')
-        assert hasattr(agent, 'general_physician')
+        # Routing and aggregation are injected; without them the globals are used
+        assert orchestrator_agent.expert_router is None
+        assert orchestrator_agent.aggregator is None
+        assert orchestrator_agent.system_prompt is not None
 
-    @patch('src.agents.orchestrator_agent.get_agent_prompt')
-    def test_get_system_prompt(self, mock_get_prompt):
+    def test_get_system_prompt(self, orchestrator_agent, mocker):
         """Test system prompt retrieval."""
-        mock_get_prompt.return_value = "Test orchestrator prompt"
+        mock_get_prompt = mocker.patch.object(
+            sys.modules[OrchestratorAgent.__module__],
+            "get_agent_prompt",
+            return_value="Test orchestrator prompt"
+        )
         
-        agent = OrchestratorAgent()
-        prompt = agent.get_system_prompt()
+        prompt = orchestrator_agent._get_system_prompt()
         
         assert prompt == "Test orchestrator prompt"
         mock_get_prompt.assert_called_once_with("orchestrator")
 
-    @patch('src.agents.orchestrator_agent.get_mongo')
-    @patch('src.agents.orchestrator_agent.get_redis')
-    async def test_process_query_simple(self, mock_redis, mock_mongo):
+    async def test_process_query_simple(self, mocker):
         """Test simple query processing."""
         # Mock dependencies
-        mock_redis_client = AsyncMock()
+        mock_redis_client = MagicMock()  # RedisDB is synchronous
         mock_redis_client.get_chat_history.return_value = []
-        mock_redis.return_value = mock_redis_client
         
         mock_mongo_client = AsyncMock()
         mock_mongo_client.get_user_data.return_value = {"user_id": "test", "age": 30}
-        mock_mongo.return_value = mock_mongo_client
         
-        agent = OrchestratorAgent()
+        # src.agents re-exports an instance named orchestrator_agent, so
+        # patch the module object rather than a dotted string target.
+        orchestrator_module = sys.modules[OrchestratorAgent.__module__]
+        mocker.patch.object(orchestrator_module, "get_redis", return_value=mock_redis_client)
+        mocker.patch.object(orchestrator_module, "get_mongo", new_callable=AsyncMock, return_value=mock_mongo_client)
         
         # Mock the specialist response
-        with patch.object(agent.cardiologist, 'consult', return_value='{"summary": "Test response", "confidence": 8, "sources": ["test"]}'):
-            response = await agent.process_query(
-                user_id="test-user",
-                query="I have chest pain",
-                session_id="test-session"
-            )
-            
-            assert "summary" in response or "Test response" in response
+        cardiologist = AsyncMock()
+        cardiologist.analyze_query.return_value = CARDIO_RESPONSE
+        
+        router = create_autospec(ExpertRouter, instance=True)
+        router.select_specialists.return_value = [{"type": "cardiology", "agent": cardiologist}]
+        aggregator = create_autospec(AggregatorAgent, instance=True)
+        aggregator.synthesize_response.return_value = AGGREGATED_RESPONSE
+        
+        agent = OrchestratorAgent(expert_router=router, aggregator=aggregator)
+        
+        response = await agent.process_user_message(
+            patient_id="test-user",
+            session_id="test-session",
+            message="I have chest pain"
+        )
+        
+        assert response["content"] == AGGREGATED_RESPONSE["content"]
+        cardiologist.analyze_query.assert_awaited_once()
 
 
 class TestIngestionAgent:
     """Test cases for IngestionAgent."""
 
-    def test_init(self):
+    def test_init(self, ingestion_agent):
         """Test IngestionAgent initialization."""
-        agent = IngestionAgent()
-        assert agent.supported_formats == ['.pdf', '.png', '.jpg', '.jpeg', '.tiff', '.bmp']
+        assert ingestion_agent.supported_formats == ['.pdf', '.png', '.jpg', '.jpeg', '.tiff', '.bmp']
 
-    @patch('src.agents.ingestion_agent.get_mongo')
-    @patch('src.agents.ingestion_agent.get_neo4j')
-    @patch('src.agents.ingestion_agent.get_milvus')
-    async def test_process_document(self, mock_milvus, mock_neo4j, mock_mongo):
+    async def test_process_document(self, ingestion_agent, mocker, monkeypatch):
         """Test document processing pipeline."""
         # Mock database clients
         mock_mongo_client = AsyncMock()
-        mock_mongo_client.store_document_metadata.return_value = "test-doc-id"
-        mock_mongo.return_value = mock_mongo_client
-        
-        mock_neo4j_client = MagicMock()
-        mock_neo4j_client.create_document_node.return_value = True
-        mock_neo4j.return_value = mock_neo4j_client
-        
-        mock_milvus_client = AsyncMock()
-        mock_milvus_client.store_embeddings.return_value = True
-        mock_milvus.return_value = mock_milvus_client
-        
-        agent = IngestionAgent()
-        
-        # Mock the file processing methods
-        with patch.object(agent, '_extract_text', return_value="Sample medical text"):
-            with patch.object(agent, '_extract_entities', return_value={"conditions": ["hypertension"]}):
-                with patch.object(agent, '_generate_embeddings', return_value=[0.1, 0.2, 0.3]):
-                    
-                    result = await agent.process_document(
-                        user_id="test-user",
-                        document_id="test-doc",
-                        file_path="/tmp/test.pdf",
-                        metadata={"filename": "test.pdf"}
-                    )
-                    
-                    assert "document_id" in result
-                    assert result["status"] == "completed"
-
-    def test_extract_text_unsupported_format(self):
+        mock_mongo_client.store_medical_record.return_value = "test-record-id"
+        mock_neo4j_client = MagicMock()  # Neo4jDB is synchronous
+        mock_milvus_client = MagicMock()  # MilvusDB is synchronous
+        
+        # src.agents re-exports an instance named ingestion_agent, so patch the
+        # module object rather than a dotted string target.
+        ingestion_module = sys.modules[IngestionAgent.__module__]
+        mocker.patch.object(ingestion_module, "get_mongo", new_callable=AsyncMock, return_value=mock_mongo_client)
+        mocker.patch.object(ingestion_module, "get_graph", return_value=mock_neo4j_client)
+        mocker.patch.object(ingestion_module, "get_milvus", return_value=mock_milvus_client)
+        mocker.patch.object(ingestion_module, "log_user_action")
+        
+        agent = ingestion_agent
+        
+        # Stub the extraction steps (file parsing, LLM calls, long-term memory)
+        monkeypatch.setattr(agent, "_extract_text", AsyncMock(return_value={
+            "success": True, "text": "Patient diagnosed with hypertension.", "page_count": 1
+        }))
+        monkeypatch.setattr(agent, "_extract_medical_entities", AsyncMock(return_value={
+            "diagnoses": [{"condition": "hypertension", "bodyRegion": "Heart"}]
+        }))
+        monkeypatch.setattr(agent, "_extract_and_store_lifestyle_factors", AsyncMock())
+        
+        result = await agent.process_document(
+            patient_id="test-user",
+            document_id="test-doc",
+            file_path="/tmp/test.pdf",
+            metadata={"filename": "test.pdf"}
+        )
+        
+        assert result["success"] is True
+        assert result["document_id"] == "test-doc"
+        assert result["mongo_id"] == "test-record-id"
+        agent._extract_text.assert_awaited_once_with("/tmp/test.pdf", {"filename": "test.pdf"})
+        mock_mongo_client.store_medical_record.assert_awaited_once()
+        assert mock_mongo_client.store_medical_record.call_args.kwargs["record_type"] == "document"
+        mock_neo4j_client.create_medical_event.assert_called_once()
+        assert mock_neo4j_client.create_medical_event.call_args.kwargs["body_parts"] == ["Heart"]
+        assert mock_milvus_client.store_document_embeddings.call_args_list[0].kwargs["document_id"] == "test-doc"
+
+    async def test_extract_text_unsupported_format(self, ingestion_agent):
         """Test text extraction with unsupported file format."""
-        agent = IngestionAgent()
+        result = await ingestion_agent._extract_text("/tmp/test.txt", {})
         
-        # Test with unsupported file extension
-        result = agent._extract_text("/tmp/test.txt")
-        assert result == ""  # Should return empty string for unsupported formats
+        assert result == {"success": False, "error": "Unsupported file format: .txt"}
 
 
 class TestAgentIntegration:
     """Integration tests for agent interactions."""
 
-    @patch('src.agents.orchestrator_agent.get_mongo')
-    @patch('src.agents.orchestrator_agent.get_redis')
-    async def test_orchestrator_with_multiple_specialists(self, mock_redis, mock_mongo):
-        """Test orchestrator coordinating multiple specialists."""
+    @pytest.mark.parametrize("expected_specialists", [
+        ["cardiology"],
+        ["neurology"],
+        ["cardiology", "neurology"],
+    ], ids=["cardiology", "neurology", "cardiology+neurology"])
+    async def test_orchestrator_with_multiple_specialists(self, mocker, expected_specialists):
+        """Test orchestrator aggregating whichever specialists the router selects."""
         # Mock dependencies
-        mock_redis_client = AsyncMock()
+        mock_redis_client = MagicMock()  # RedisDB is synchronous
         mock_redis_client.get_chat_history.return_value = []
-        mock_redis.return_value = mock_redis_client
         
         mock_mongo_client = AsyncMock()
         mock_mongo_client.get_user_data.return_value = {"user_id": "test", "age": 30}
-        mock_mongo.return_value = mock_mongo_client
-        
-        agent = OrchestratorAgent()
-        
-        # Mock multiple specialist responses
-        cardio_response = '{"summary": "Heart looks normal", "confidence": 8, "sources": ["ECG"]}'
-        neuro_response = '{"summary": "No neurological issues", "confidence": 7, "sources": ["MRI"]}'
-        
-        with patch.object(agent.cardiologist, 'consult', return_value=cardio_response):
-            with patch.object(agent.neurologist, 'consult', return_value=neuro_response):
-                with patch.object(agent.aggregator, 'aggregate', return_value='{"summary": "Overall healthy", "confidence": 7, "sources": ["ECG", "MRI"]}'):
-                    
-                    response = await agent.process_query(
-                        user_id="test-user",
-                        query="I have chest pain and headaches",
-                        session_id="test-session"
-                    )
-                    
-                    # Should aggregate multiple specialist responses
-                    assert response is not None
-
-    @patch('src.agents.ingestion_agent.get_entities_prompt')
-    @patch('src.agents.ingestion_agent.get_ocr_prompt')
-    def test_ingestion_agent_uses_prompts(self, mock_ocr_prompt, mock_entities_prompt):
-        """Test that ingestion agent uses prompt system."""
-        mock_ocr_prompt.return_value = "Test OCR prompt"
-        mock_entities_prompt.return_value = "Test entities prompt"
-        
-        agent = IngestionAgent()
-        
-        # The agent should be able to access prompts
-        assert hasattr(agent, '_extract_entities')
-        # Verify prompts are accessible (they're imported)
-        from src.agents.ingestion_agent import get_entities_prompt, get_ocr_prompt
-        assert get_entities_prompt() == "Test entities prompt"
-        assert get_ocr_prompt() == "Test OCR prompt"
+        
+        # src.agents re-exports an instance named orchestrator_agent, so
+        # patch the module object rather than a dotted string target.
+        orchestrator_module = sys.modules[OrchestratorAgent.__module__]
+        mocker.patch.object(orchestrator_module, "get_redis", return_value=mock_redis_client)
+        mocker.patch.object(orchestrator_module, "get_mongo", new_callable=AsyncMock, return_value=mock_mongo_client)
+        
+        # Mock specialist responses
+        specialist_responses = {"cardiology": CARDIO_RESPONSE, "neurology": NEURO_RESPONSE}
+        selected = []
+        for specialty in expected_specialists:
+            specialist = AsyncMock()
+            specialist.analyze_query.return_value = specialist_responses[specialty]
+            selected.append({"type": specialty, "agent": specialist})
+        
+        router = create_autospec(ExpertRouter, instance=True)
+        router.select_specialists.return_value = selected
+        aggregator = create_autospec(AggregatorAgent, instance=True)
+        aggregator.synthesize_response.return_value = AGGREGATED_RESPONSE
+        
+        agent = OrchestratorAgent(expert_router=router, aggregator=aggregator)
+        
+        response = await agent.process_user_message(
+            patient_id="test-user",
+            session_id="test-session",
+            message="I have symptoms"
+        )
+        
+        # Routing is stubbed; every selected specialist response must be aggregated
+        assert response is not None
+        aggregated = aggregator.synthesize_response.call_args.kwargs["specialist_responses"]
+        assert [r["specialist_type"] for r in aggregated] == expected_specialists
@@ -3,17 +3,29 @@ Unit tests for authentication and dependencies.
 """
 
 import pytest
-from unittest.mock import Mock
+from types import SimpleNamespace
+
+VALID_PATIENT_ID = "PT_A5F4FBC67D744EF282389AD0F7633A4"
+
+
+@pytest.fixture(scope="session")
+def mock_user():
+    """Authenticated user stub owning VALID_PATIENT_ID."""
+    return SimpleNamespace(patient_id=VALID_PATIENT_ID, sub=f"user_{VALID_PATIENT_ID}")
+
 
 class TestAuthentication:
     """Test authentication functionality"""
     
-    def test_patient_id_structure(self):
-        """Test patient ID structure validation"""
+    @pytest.mark.parametrize("patient_id", [VALID_PATIENT_ID])
+    def test_patient_id_valid(self, patient_id, mock_user):
+        """Test patient ID structure and isolation logic"""
         # Test that patient IDs follow expected format
-        valid_patient_id = "PT_A5F4FBC67D744EF282389AD0F7633A4"
-        assert valid_patient_id.startswith("PT_")
-        assert len(valid_patient_id) == 34  # PT_ + 32 character hash
+        assert patient_id.startswith("PT_")
+        assert len(patient_id) == 34  # PT_ + 32 character hash
+        
+        assert mock_user.patient_id == patient_id
+        assert mock_user.patient_id in mock_user.sub
         
     def test_jwt_token_structure(self):
         """Test JWT token structure"""
@@ -29,16 +41,6 @@ class TestAuthentication:
         token = auth_header.replace("Bearer ", "")
         assert len(token) > 0
         
-    def test_patient_id_isolation(self):
-        """Test patient ID isolation logic"""
-        # Mock test for patient ID validation
-        mock_user = Mock()
-        mock_user.patient_id = "PT_A5F4FBC67D744EF282389AD0F7633A4"
-        mock_user.sub = "user_PT_A5F4FBC67D744EF282389AD0F7633A4"
-        
-        assert mock_user.patient_id == "PT_A5F4FBC67D744EF282389AD0F7633A4"
-        assert mock_user.patient_id in mock_user.sub
-        
     def test_hipaa_compliance_fields(self):
         """Test HIPAA compliance data structure"""
         # Test that patient data has required isolation fields
@@ -2,43 +2,54 @@
 Unit tests for database modules.
 """
 
+import sys
+
 import pytest
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime
 from typing import Dict, Any
 
+from src.db.milvus_db import MilvusDB
 from src.db.mongo_db import MongoDB
 from src.db.neo4j_db import Neo4jDB
-from src.db.milvus_db import MilvusDB
 from src.db.redis_db import RedisDB
 
+# Raw Redis replies, encoded once at import.
+_CHAT_HISTORY_PAYLOAD = [b'{"role": "user", "content": "test"}']
+_SESSION_PAYLOAD = b'{"key": "value", "timestamp": "2023-01-01T00:00:00"}'
+
+# Milvus search hit; entity only needs the dict-style .get() the manager uses.
+_MILVUS_HIT = SimpleNamespace(
+    distance=0.5,
+    entity={"content": "result1", "document_id": "doc123", "metadata": {}, "timestamp": "2024-01-01T00:00:00"}
+)
+
 
 class TestMongoDBManager:
     """Test cases for MongoDB manager."""
     
-    @pytest.fixture
-    def mongo_manager(self):
-        """Create MongoDB manager instance."""
-        return MongoDB()
+    manager_class = MongoDB
     
-    @pytest.mark.asyncio
-    async def test_init_mongo_success(self, mongo_manager):
+    async def test_init_mongo_success(self, db_manager):
         """Test successful MongoDB initialization."""
-        with patch('motor.motor_asyncio.AsyncIOMotorClient') as mock_client:
-            mock_db = MagicMock()
-            mock_client.return_value.__getitem__.return_value = mock_db
-            
-            await mongo_manager.initialize("mongodb://localhost:27017", "test_db")
-            
-            assert mongo_manager._initialized is True
-            mock_client.assert_called_once_with("mongodb://localhost:27017")
+        # motor.motor_asyncio is stubbed in tests/conftest.py
+        mock_client = sys.modules["motor.motor_asyncio"].AsyncIOMotorClient
+        mock_client.reset_mock()
+        mock_client.return_value.admin.command = AsyncMock()
+        mock_db = AsyncMock()
+        mock_client.return_value.__getitem__.return_value = mock_db
+        
+        await db_manager.initialize("mongodb://localhost:27017", "test_db")
+        
+        assert db_manager._initialized is True
+        mock_client.assert_called_once_with("mongodb://localhost:27017")
     
-    @pytest.mark.asyncio
-    async def test_store_medical_record(self, mongo_manager):
+    async def test_store_medical_record(self, db_manager, mongo_db):
         """Test storing medical record."""
-        mongo_manager._initialized = True
-        mongo_manager.db = MagicMock()
-        mongo_manager.db.medical_records.insert_one = AsyncMock(return_value=MagicMock(inserted_id="test_id"))
+        db_manager._initialized = True
+        db_manager.db = mongo_db
+        db_manager.db.medical_records.insert_one.return_value = SimpleNamespace(inserted_id="test_id")
         
         record_data = {
             "patient_id": "test_patient",
@@ -46,33 +57,33 @@ class TestMongoDBManager:
             "timestamp": datetime.utcnow()
         }
         
-        with patch.object(mongo_manager, '_hash_user_id', return_value="hashed_id"):
-            result = await mongo_manager.store_medical_record("user123", record_data)
-            
-            assert result == "test_id"
-            mongo_manager.db.medical_records.insert_one.assert_called_once()
+        result = await db_manager.store_medical_record("user123", record_data)
+        
+        assert result == "test_id"
+        db_manager.db.medical_records.insert_one.assert_called_once()
     
-    @pytest.mark.asyncio
-    async def test_get_medical_records(self, mongo_manager):
+    async def test_get_medical_records(self, db_manager, mongo_db):
         """Test retrieving medical records."""
-        mongo_manager._initialized = True
-        mongo_manager.db = MagicMock()
+        db_manager._initialized = True
+        db_manager.db = mongo_db
         
         mock_cursor = MagicMock()
-        mock_cursor.to_list = AsyncMock(return_value=[{"record": "test"}])
-        mongo_manager.db.medical_records.find.return_value.sort.return_value.limit.return_value = mock_cursor
+        mock_cursor.to_list = AsyncMock(return_value=[{"_id": "record_id", "user_id": "hashed_id", "record": "test"}])
+        find = db_manager.db.medical_records.find
+        find.return_value.sort.return_value.skip.return_value.limit.return_value = mock_cursor
         
-        with patch.object(mongo_manager, '_hash_user_id', return_value="hashed_id"):
-            result = await mongo_manager.get_medical_records("user123")
-            
-            assert result == [{"record": "test"}]
+        result = await db_manager.get_medical_records("user123")
+        
+        # The hashed user id is stripped from what callers see
+        assert result == [{"_id": "record_id", "record": "test"}]
+        find.assert_called_once_with({"user_id": "hashed_id"})
+        find.return_value.sort.return_value.skip.assert_called_once_with(0)
     
-    @pytest.mark.asyncio
-    async def test_store_timeline_event(self, mongo_manager):
+    async def test_store_timeline_event(self, db_manager, mongo_db):
         """Test storing timeline event."""
-        mongo_manager._initialized = True
-        mongo_manager.db = MagicMock()
-        mongo_manager.db.timeline_events.insert_one = AsyncMock(return_value=MagicMock(inserted_id="timeline_id"))
+        db_manager._initialized = True
+        db_manager.db = mongo_db
+        db_manager.db.timeline_events.insert_one.return_value = SimpleNamespace(inserted_id="timeline_id")
         
         event_data = {
             "title": "Test Event",
@@ -80,57 +91,122 @@ class TestMongoDBManager:
             "event_type": "medical"
         }
         
-        with patch.object(mongo_manager, '_hash_user_id', return_value="hashed_id"):
-            with patch('src.db.mongo_db.ObjectId', return_value="event_123"):
-                result = await mongo_manager.store_timeline_event("user123", event_data)
-                
-                assert result == "event_123"
-                mongo_manager.db.timeline_events.insert_one.assert_called_once()
+        result = await db_manager.store_timeline_event("user123", event_data)
+        
+        assert result.startswith("oid_")
+        db_manager.db.timeline_events.insert_one.assert_called_once()
+        assert db_manager.db.timeline_events.insert_one.call_args.args[0]["event_id"] == result
+
+
+class TestRedisManager:
+    """Test cases for Redis manager."""
+    
+    manager_class = RedisDB
+    
+    def test_initialize_success(self, db_manager):
+        """Test successful Redis initialization."""
+        redis_module = sys.modules[type(db_manager).__module__]
+        with patch.object(redis_module, "REDIS_AVAILABLE", True), \
+                patch.object(redis_module, "redis") as mock_redis:
+            db_manager.initialize("localhost", 6379)
+            
+            assert db_manager._initialized is True
+            mock_redis.Redis.assert_called_once()
+            mock_redis.Redis.return_value.ping.assert_called_once()
+    
+    def test_store_chat_message(self, db_manager, frozen_iso, redis_client):
+        """Test storing chat message."""
+        db_manager._initialized = True
+        db_manager.client = redis_client
+        
+        message_data = {
+            "role": "user",
+            "content": "Test message",
+            "timestamp": frozen_iso
+        }
+        
+        result = db_manager.store_chat_message("user123", "session123", message_data)
+        
+        assert result is True
+        db_manager.client.lpush.assert_called_once()
+    
+    def test_get_chat_history(self, db_manager, redis_client):
+        """Test retrieving chat history."""
+        db_manager._initialized = True
+        db_manager.client = redis_client
+        db_manager.client.lrange.return_value = _CHAT_HISTORY_PAYLOAD
+        
+        result = db_manager.get_chat_history("user123", "session123")
+        
+        assert len(result) == 1
+        assert result[0]["content"] == "test"
+        db_manager.client.lrange.assert_called_once()
+    
+    def test_store_session_data(self, db_manager, frozen_iso, redis_client):
+        """Test storing session data."""
+        db_manager._initialized = True
+        db_manager.client = redis_client
+        
+        session_data = {"key": "value", "timestamp": frozen_iso}
+        
+        result = db_manager.store_session_data("user123", "session123", session_data)
+        
+        assert result is True
+        db_manager.client.setex.assert_called_once()
+    
+    def test_get_session_data(self, db_manager, redis_client):
+        """Test retrieving session data."""
+        db_manager._initialized = True
+        db_manager.client = redis_client
+        db_manager.client.get.return_value = _SESSION_PAYLOAD
+        
+        result = db_manager.get_session_data("user123", "session123")
+        
+        assert result["key"] == "value"
+        db_manager.client.get.assert_called_once()
 
 
 class TestNeo4jManager:
-    """Test cases for Neo4j manager."""
+    """Test cases for Neo4j manager (neo4j is stubbed in tests/conftest.py)."""
+    
+    manager_class = Neo4jDB
     
     @pytest.fixture
-    def neo4j_manager(self):
-        """Create Neo4j manager instance."""
-        return Neo4jDB()
+    def neo4j_session(self, db_manager):
+        """Install a driver stub and return the session its context manager yields."""
+        db_manager._initialized = True
+        db_manager.driver = MagicMock()
+        return db_manager.driver.session.return_value.__enter__.return_value
     
-    def test_initialize_success(self, neo4j_manager):
+    def test_initialize_success(self, db_manager):
         """Test successful Neo4j initialization."""
-        with patch('neo4j.GraphDatabase.driver') as mock_driver:
-            neo4j_manager.initialize("bolt://localhost:7687", "neo4j", "password")
+        neo4j_module = sys.modules[type(db_manager).__module__]
+        with patch.object(neo4j_module, "GraphDatabase") as mock_graph_db:
+            db_manager.initialize("bolt://localhost:7687", "neo4j", "password")
             
-            assert neo4j_manager._initialized is True
-            mock_driver.assert_called_once_with("bolt://localhost:7687", auth=("neo4j", "password"))
+            assert db_manager._initialized is True
+            mock_graph_db.driver.assert_called_once_with("bolt://localhost:7687", auth=("neo4j", "password"))
     
-    def test_create_patient_node(self, neo4j_manager):
+    def test_create_patient_node(self, db_manager, neo4j_session):
         """Test creating patient node."""
-        neo4j_manager._initialized = True
-        mock_driver = MagicMock()
-        mock_session = MagicMock()
-        mock_driver.session.return_value = mock_session
-        neo4j_manager.driver = mock_driver
-        
         patient_data = {
             "name": "John Doe",
             "age": 30,
             "gender": "M"
         }
         
-        with patch.object(neo4j_manager, '_hash_user_id', return_value="hashed_id"):
-            result = neo4j_manager.create_patient_node("user123", patient_data)
-            
-            assert result is True
-            mock_session.run.assert_called()
+        result = db_manager.create_patient_node("user123", patient_data)
+        
+        assert result is True
+        params = neo4j_session.run.call_args.args[1]
+        assert params["patient_id"] == "hashed_id"
+        assert params["age"] == 30
     
-    def test_create_medical_event(self, neo4j_manager):
+    def test_create_medical_event(self, db_manager, neo4j_session, monkeypatch):
         """Test creating medical event."""
-        neo4j_manager._initialized = True
-        mock_driver = MagicMock()
-        mock_session = MagicMock()
-        mock_driver.session.return_value = mock_session
-        neo4j_manager.driver = mock_driver
+        monkeypatch.setattr(db_manager, "ensure_user_initialized", MagicMock(return_value=True))
+        monkeypatch.setattr(db_manager, "calculate_severity_from_events", MagicMock(return_value="mild"))
+        monkeypatch.setattr(db_manager, "update_body_part_severity", MagicMock(return_value=True))
         
         event_data = {
             "title": "Chest Pain",
@@ -138,146 +214,54 @@ class TestNeo4jManager:
             "event_type": "symptom"
         }
         
-        with patch.object(neo4j_manager, '_hash_user_id', return_value="hashed_id"):
-            with patch.object(neo4j_manager, '_identify_body_parts', return_value=["chest"]):
-                result = neo4j_manager.create_medical_event("user123", event_data)
-                
-                assert isinstance(result, str)
-                mock_session.run.assert_called()
+        result = db_manager.create_medical_event("user123", event_data, body_parts=["chest"])
+        
+        assert result.startswith("event_hashed_id_")
+        # Event node, body-part link, then the event-count update
+        assert neo4j_session.run.call_count == 3
+        assert neo4j_session.run.call_args_list[0].args[1]["title"] == "Chest Pain"
+        db_manager.update_body_part_severity.assert_called_once_with("user123", "chest", "mild")
 
 
 class TestMilvusManager:
-    """Test cases for Milvus manager."""
+    """Test cases for Milvus manager (pymilvus is stubbed in tests/conftest.py)."""
     
-    @pytest.fixture
-    def milvus_manager(self):
-        """Create Milvus manager instance."""
-        return MilvusDB()
+    manager_class = MilvusDB
     
-    def test_initialize_success(self, milvus_manager):
+    def test_initialize_success(self, db_manager, monkeypatch):
         """Test successful Milvus initialization."""
-        with patch('pymilvus.connections.connect') as mock_connect:
-            milvus_manager.initialize("localhost", 19530)
-            
-            assert milvus_manager._initialized is True
-            mock_connect.assert_called_once()
-    
-    @pytest.mark.asyncio
-    async def test_store_embeddings(self, milvus_manager):
-        """Test storing embeddings."""
-        milvus_manager._initialized = True
-        
-        with patch('pymilvus.Collection') as mock_collection:
-            mock_coll_instance = MagicMock()
-            mock_collection.return_value = mock_coll_instance
-            
-            embeddings = [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]
-            texts = ["text1", "text2"]
-            
-            with patch.object(milvus_manager, '_hash_user_id', return_value="hashed_id"):
-                result = await milvus_manager.store_embeddings("user123", "doc123", embeddings, texts)
-                
-                assert result is True
-                mock_coll_instance.insert.assert_called_once()
-    
-    @pytest.mark.asyncio
-    async def test_search_similar(self, milvus_manager):
-        """Test similarity search."""
-        milvus_manager._initialized = True
-        
-        with patch('pymilvus.Collection') as mock_collection:
-            mock_coll_instance = MagicMock()
-            mock_collection.return_value = mock_coll_instance
-            
-            mock_result = MagicMock()
-            mock_result.__iter__ = lambda x: iter([MagicMock(entity=MagicMock(text="result1", score=0.9))])
-            mock_coll_instance.search.return_value = [mock_result]
-            
-            query_embedding = [0.1, 0.2, 0.3]
-            
-            with patch.object(milvus_manager, '_hash_user_id', return_value="hashed_id"):
-                results = await milvus_manager.search_similar("user123", query_embedding)
-                
-                assert len(results) > 0
-                mock_coll_instance.search.assert_called_once()
-
-
-class TestRedisManager:
-    """Test cases for Redis manager."""
-    
-    @pytest.fixture
-    def redis_manager(self):
-        """Create Redis manager instance."""
-        return RedisDB()
-    
-    @pytest.mark.asyncio
-    async def test_initialize_success(self, redis_manager):
-        """Test successful Redis initialization."""
-        with patch('redis.asyncio.Redis.from_url') as mock_redis:
-            mock_client = AsyncMock()
-            mock_redis.return_value = mock_client
-            mock_client.ping.return_value = True
-            
-            await redis_manager.initialize("redis://localhost:6379")
+        # Keep SentenceTransformer out of unit runs; embeddings fall back to a fixed vector.
+        monkeypatch.setattr(db_manager, "_init_embedding_model", lambda: None)
+        milvus_module = sys.modules[type(db_manager).__module__]
+        with patch.object(milvus_module, "connections") as mock_connections:
+            db_manager.initialize("localhost", 19530)
             
-            assert redis_manager._initialized is True
-            mock_redis.assert_called_once()
+            assert db_manager._initialized is True
+            mock_connections.connect.assert_called_once_with(alias="default", host="localhost", port="19530")
     
-    @pytest.mark.asyncio
-    async def test_store_chat_message(self, redis_manager):
-        """Test storing chat message."""
-        redis_manager._initialized = True
-        redis_manager.client = AsyncMock()
-        
-        message_data = {
-            "role": "user",
-            "content": "Test message",
-            "timestamp": datetime.utcnow().isoformat()
-        }
+    def test_store_document_embeddings(self, db_manager):
+        """Test storing document embeddings."""
+        db_manager._initialized = True
+        db_manager.collection = MagicMock()
+        db_manager.collection.insert.return_value = SimpleNamespace(primary_keys=[1, 2])
         
-        with patch.object(redis_manager, '_hash_user_id', return_value="hashed_id"):
-            result = await redis_manager.store_chat_message("user123", "session123", message_data)
-            
-            assert result is True
-            redis_manager.client.lpush.assert_called_once()
-    
-    @pytest.mark.asyncio
-    async def test_get_chat_history(self, redis_manager):
-        """Test retrieving chat history."""
-        redis_manager._initialized = True
-        redis_manager.client = AsyncMock()
-        redis_manager.client.lrange.return_value = [b'{"role": "user", "content": "test"}']
+        result = db_manager.store_document_embeddings("user123", "doc123", ["text1", "text2", "  "])
         
-        with patch.object(redis_manager, '_hash_user_id', return_value="hashed_id"):
-            result = await redis_manager.get_chat_history("user123", "session123")
-            
-            assert len(result) == 1
-            assert result[0]["content"] == "test"
-            redis_manager.client.lrange.assert_called_once()
+        assert result == [1, 2]
+        entities = db_manager.collection.insert.call_args.args[0]
+        assert entities[0] == ["hashed_id", "hashed_id"]
+        assert entities[2] == ["text1", "text2"]
+        db_manager.collection.flush.assert_called_once()
     
-    @pytest.mark.asyncio
-    async def test_store_session_data(self, redis_manager):
-        """Test storing session data."""
-        redis_manager._initialized = True
-        redis_manager.client = AsyncMock()
-        
-        session_data = {"key": "value", "timestamp": datetime.utcnow().isoformat()}
+    def test_search_similar_documents(self, db_manager):
+        """Test similarity search."""
+        db_manager._initialized = True
+        db_manager.collection = MagicMock()
+        db_manager.collection.search.return_value = [[_MILVUS_HIT]]
         
-        with patch.object(redis_manager, '_hash_user_id', return_value="hashed_id"):
-            result = await redis_manager.store_session_data("user123", "session123", session_data)
-            
-            assert result is True
-            redis_manager.client.hset.assert_called_once()
-    
-    @pytest.mark.asyncio
-    async def test_get_session_data(self, redis_manager):
-        """Test retrieving session data."""
-        redis_manager._initialized = True
-        redis_manager.client = AsyncMock()
-        redis_manager.client.hgetall.return_value = {b"key": b'"value"', b"timestamp": b'"2023-01-01T00:00:00"'}
+        results = db_manager.search_similar_documents("user123", "chest pain", score_threshold=1.0)
         
-        with patch.object(redis_manager, '_hash_user_id', return_value="hashed_id"):
-            result = await redis_manager.get_session_data("user123", "session123")
-            
-            assert result["key"] == "value"
-            redis_manager.client.hgetall.assert_called_once()
+        assert len(results) == 1
+        assert results[0]["content"] == "result1"
+        assert results[0]["similarity_score"] == pytest.approx(1.0 / 1.5)
+        assert db_manager.collection.search.call_args.kwargs["expr"] == 'user_id_hash == "hashed_id"'
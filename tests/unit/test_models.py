@@ -4,7 +4,6 @@ Unit tests for data models and schemas.
 
 import pytest
 from pydantic import ValidationError
-from datetime import datetime
 from typing import Optional
 
 class TestDataModels:
@@ -28,12 +27,12 @@ class TestDataModels:
         # In real implementation, this would raise ValidationError
         assert "message" not in request_data
         
-    def test_chat_response_valid(self):
+    def test_chat_response_valid(self, frozen_iso):
         """Test valid ChatResponse creation"""
         response_data = {
             "response": "Hello back",
             "session_id": "test",
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": frozen_iso
         }
         assert response_data["response"] == "Hello back"
         assert response_data["session_id"] == "test"
@@ -50,14 +49,14 @@ class TestDataModels:
         assert response_data["status"] == "queued"
         assert response_data["message"] == "File uploaded successfully"
         
-    def test_processing_status_valid(self):
+    def test_processing_status_valid(self, frozen_iso):
         """Test valid ProcessingStatus creation"""
         status_data = {
             "task_id": "test-task",
             "status": "processing",
             "progress": 0.5,
             "message": "Processing document",
-            "started_at": datetime.utcnow().isoformat()
+            "started_at": frozen_iso
         }
         assert status_data["task_id"] == "test-task"
         assert status_data["status"] == "processing"
@@ -6,221 +6,228 @@ import pytest
 import json
 import tempfile
 from pathlib import Path
-from unittest.mock import patch, mock_open
+from unittest.mock import MagicMock, patch, mock_open
 
 from src.prompts import PromptManager, get_agent_prompt, get_ocr_prompt, get_entities_prompt
 
+EXPECTED_PROMPTS_DIR = Path(__file__).parents[2] / "src" / "prompts"
+
+TEST_PROMPT_DATA = {
+    "agent": "Test Agent",
+    "role": "Test role",
+    "goals": ["Goal 1", "Goal 2"],
+    "tone": "Professional",
+    "step_by_step_reasoning": ["Step 1", "Step 2"],
+    "output_schema": "test_schema",
+    "hallucination_guard": "Test guard",
+    "example_output": {"test": "example"}
+}
+TEST_PROMPT_BYTES = json.dumps(TEST_PROMPT_DATA).encode("utf-8")
+
+MINIMAL_DATA = {"agent": "Minimal Agent"}
+LOGIC_DATA = {
+    "agent": "Logic Agent",
+    "logic": ["Logic step 1", "Logic step 2"]
+}
+WORKFLOW_DATA = {
+    "agent": "Workflow Agent",
+    "workflow": ["Workflow step 1", "Workflow step 2"]
+}
+OCR_DATA = {"system": "Test OCR prompt"}
+ENTITIES_DATA = {"system": "Test entities prompt"}
+NO_EXAMPLE_DATA = {"agent": "No example"}
+
+
+@pytest.fixture
+def patched_load(monkeypatch):
+    """Replace PromptManager.load_prompt with a stub that records prompt names.
+    
+    Set ``return_value`` or ``side_effect`` on the returned stub; requested
+    prompt names accumulate in ``calls``.
+    """
+    def _load(self, prompt_name):
+        _load.calls.append(prompt_name)
+        if _load.side_effect is not None:
+            raise _load.side_effect
+        return _load.return_value
+    
+    _load.calls = []
+    _load.return_value = None
+    _load.side_effect = None
+    monkeypatch.setattr(PromptManager, "load_prompt", _load)
+    return _load
+
 
 class TestPromptManager:
     """Test cases for PromptManager class."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.prompt_manager = PromptManager()
-        self.test_prompt_data = {
-            "agent": "Test Agent",
-            "role": "Test role",
-            "goals": ["Goal 1", "Goal 2"],
-            "tone": "Professional",
-            "step_by_step_reasoning": ["Step 1", "Step 2"],
-            "output_schema": "test_schema",
-            "hallucination_guard": "Test guard",
-            "example_output": {"test": "example"}
-        }
-    
-    def test_init(self):
+    @pytest.fixture(autouse=True)
+    def _reset(self, prompt_manager):
+        """Start every test with an empty prompt cache."""
+        prompt_manager._cache.clear()
+    
+    def test_init(self, prompt_manager):
         """Test PromptManager initialization."""
-        pm = PromptManager()
-        assert pm.prompts_dir == Path(__file__).parent.parent.parent / "src" / "prompts"
-        assert pm._cache == {}
+        assert prompt_manager.prompts_dir == EXPECTED_PROMPTS_DIR
+        assert prompt_manager.prompts_dir.exists()
+        assert prompt_manager._cache == {}
     
-    @patch("builtins.open", new_callable=mock_open)
-    @patch("pathlib.Path.exists")
-    def test_load_prompt_success(self, mock_exists, mock_file):
-        """Test successful prompt loading."""
-        mock_exists.return_value = True
-        mock_file.return_value.read.return_value = json.dumps(self.test_prompt_data)
-        
-        result = self.prompt_manager.load_prompt("test_prompt")
-        
-        assert result == self.test_prompt_data
-        assert "test_prompt" in self.prompt_manager._cache
-        mock_file.assert_called_once()
+    def test_load_prompt_success(self, prompt_manager, prompts_root, monkeypatch):
+        """Test loading a prompt from disk and serving repeats from the cache."""
+        (prompts_root / "disk_prompt.json").write_bytes(TEST_PROMPT_BYTES)
+        monkeypatch.setattr(prompt_manager, "prompts_dir", prompts_root)
+        
+        # First load should read file
+        result1 = prompt_manager.load_prompt("disk_prompt")
+        assert result1 == TEST_PROMPT_DATA
+        assert "disk_prompt" in prompt_manager._cache
+        
+        # Second load should use cache
+        result2 = prompt_manager.load_prompt("disk_prompt")
+        assert result1 is result2  # Same object from cache
     
     @patch("pathlib.Path.exists")
-    def test_load_prompt_file_not_found(self, mock_exists):
+    def test_load_prompt_file_not_found(self, mock_exists, prompt_manager):
         """Test FileNotFoundError when prompt file doesn't exist."""
         mock_exists.return_value = False
         
         with pytest.raises(FileNotFoundError):
-            self.prompt_manager.load_prompt("nonexistent_prompt")
+            prompt_manager.load_prompt("nonexistent_prompt")
     
-    @patch("builtins.open", new_callable=mock_open)
+    @patch("builtins.open", new_callable=mock_open, read_data=b"invalid json")
     @patch("pathlib.Path.exists")
-    def test_load_prompt_invalid_json(self, mock_exists, mock_file):
+    def test_load_prompt_invalid_json(self, mock_exists, mock_file, prompt_manager):
         """Test handling of invalid JSON in prompt file."""
         mock_exists.return_value = True
-        mock_file.return_value.read.return_value = "invalid json"
         
         with pytest.raises(json.JSONDecodeError):
-            self.prompt_manager.load_prompt("invalid_prompt")
+            prompt_manager.load_prompt("invalid_prompt")
     
-    def test_load_prompt_caching(self):
+    def test_load_prompt_caching(self, prompt_manager):
         """Test that prompts are cached after first load."""
         # Manually add to cache
-        self.prompt_manager._cache["cached_prompt"] = self.test_prompt_data
+        prompt_manager._cache.update({"cached_prompt": TEST_PROMPT_DATA})
         
-        result = self.prompt_manager.load_prompt("cached_prompt")
-        assert result == self.test_prompt_data
+        result = prompt_manager.load_prompt("cached_prompt")
+        assert result == TEST_PROMPT_DATA
     
-    @patch.object(PromptManager, 'load_prompt')
-    def test_get_system_prompt_complete(self, mock_load):
-        """Test system prompt generation with all fields."""
-        mock_load.return_value = self.test_prompt_data
-        
-        result = self.prompt_manager.get_system_prompt("test")
-        
-        expected_parts = [
+    @pytest.mark.parametrize("agent_type,data,expected_substrings", [
+        ("test", TEST_PROMPT_DATA, [
             "Agent: Test Agent",
             "Role: Test role",
             "Goals:\n- Goal 1\n- Goal 2",
             "Tone: Professional",
-            "Step-by-step reasoning:\n- Step 1\n- Step 2",
+            "Step-by-step reasoning:\nStep 1\nStep 2",
             "Output Schema: test_schema",
             "Important: Test guard"
-        ]
-        
-        for part in expected_parts:
+        ]),
+        ("minimal", MINIMAL_DATA, ["Agent: Minimal Agent"]),
+        ("logic", LOGIC_DATA, ["Logic:\nLogic step 1\nLogic step 2"]),
+        ("workflow", WORKFLOW_DATA, ["Workflow:\nWorkflow step 1\nWorkflow step 2"]),
+    ])
+    def test_get_system_prompt(self, patched_load, prompt_manager, agent_type, data, expected_substrings):
+        """Test system prompt generation for each prompt structure."""
+        patched_load.return_value = data
+        
+        result = prompt_manager.get_system_prompt(agent_type)
+        
+        for part in expected_substrings:
             assert part in result
-        mock_load.assert_called_once_with("test_prompt")
-    
-    @patch.object(PromptManager, 'load_prompt')
-    def test_get_system_prompt_minimal(self, mock_load):
-        """Test system prompt generation with minimal fields."""
-        minimal_data = {"agent": "Minimal Agent"}
-        mock_load.return_value = minimal_data
-        
-        result = self.prompt_manager.get_system_prompt("minimal")
-        
-        assert "Agent: Minimal Agent" in result
-        mock_load.assert_called_once_with("minimal_prompt")
-    
-    @patch.object(PromptManager, 'load_prompt')
-    def test_get_system_prompt_with_logic(self, mock_load):
-        """Test system prompt generation with logic field instead of reasoning."""
-        data_with_logic = {
-            "agent": "Logic Agent",
-            "logic": ["Logic step 1", "Logic step 2"]
-        }
-        mock_load.return_value = data_with_logic
-        
-        result = self.prompt_manager.get_system_prompt("logic")
-        
-        assert "Logic:\n- Logic step 1\n- Logic step 2" in result
+        assert patched_load.calls == [f"{agent_type}_prompt"]
     
-    @patch.object(PromptManager, 'load_prompt')
-    def test_get_system_prompt_with_workflow(self, mock_load):
-        """Test system prompt generation with workflow field."""
-        data_with_workflow = {
-            "agent": "Workflow Agent",
-            "workflow": ["Workflow step 1", "Workflow step 2"]
-        }
-        mock_load.return_value = data_with_workflow
-        
-        result = self.prompt_manager.get_system_prompt("workflow")
-        
-        assert "Workflow:\n- Workflow step 1\n- Workflow step 2" in result
-    
-    @patch.object(PromptManager, 'load_prompt')
-    def test_get_system_prompt_error_fallback(self, mock_load):
+    def test_get_system_prompt_error_fallback(self, patched_load, prompt_manager):
         """Test fallback behavior when prompt loading fails."""
-        mock_load.side_effect = Exception("Test error")
+        patched_load.side_effect = Exception("Test error")
         
-        result = self.prompt_manager.get_system_prompt("error")
+        result = prompt_manager.get_system_prompt("error")
         
         assert result == "You are a error medical specialist. Provide accurate, evidence-based medical information."
     
-    @patch.object(PromptManager, 'load_prompt')
-    def test_get_ocr_prompt_success(self, mock_load):
+    def test_get_ocr_prompt_success(self, patched_load, prompt_manager):
         """Test OCR prompt retrieval."""
-        ocr_data = {"system": "Test OCR prompt"}
-        mock_load.return_value = ocr_data
+        patched_load.return_value = OCR_DATA
         
-        result = self.prompt_manager.get_ocr_prompt()
+        result = prompt_manager.get_ocr_prompt()
         
         assert result == "Test OCR prompt"
-        mock_load.assert_called_once_with("ocr")
+        assert patched_load.calls == ["ocr"]
     
-    @patch.object(PromptManager, 'load_prompt')
-    def test_get_ocr_prompt_fallback(self, mock_load):
+    def test_get_ocr_prompt_fallback(self, patched_load, prompt_manager):
         """Test OCR prompt fallback on error."""
-        mock_load.side_effect = Exception("Test error")
+        patched_load.side_effect = Exception("Test error")
         
-        result = self.prompt_manager.get_ocr_prompt()
+        result = prompt_manager.get_ocr_prompt()
         
         assert result == "You are a medical OCR assistant."
     
-    @patch.object(PromptManager, 'load_prompt')
-    def test_get_entities_prompt_success(self, mock_load):
+    def test_get_entities_prompt_success(self, patched_load, prompt_manager):
         """Test entities prompt retrieval."""
-        entities_data = {"system": "Test entities prompt"}
-        mock_load.return_value = entities_data
+        patched_load.return_value = ENTITIES_DATA
         
-        result = self.prompt_manager.get_entities_prompt()
+        result = prompt_manager.get_entities_prompt()
         
         assert result == "Test entities prompt"
-        mock_load.assert_called_once_with("entities")
+        assert patched_load.calls == ["entities"]
     
-    @patch.object(PromptManager, 'load_prompt')
-    def test_get_entities_prompt_fallback(self, mock_load):
+    def test_get_entities_prompt_fallback(self, patched_load, prompt_manager):
         """Test entities prompt fallback on error."""
-        mock_load.side_effect = Exception("Test error")
+        patched_load.side_effect = Exception("Test error")
         
-        result = self.prompt_manager.get_entities_prompt()
+        result = prompt_manager.get_entities_prompt()
         
         assert result == "You are a clinical NLP model."
     
-    @patch.object(PromptManager, 'load_prompt')
-    def test_get_example_output_success(self, mock_load):
+    def test_get_example_output_success(self, patched_load, prompt_manager):
         """Test example output retrieval."""
-        mock_load.return_value = self.test_prompt_data
+        patched_load.return_value = TEST_PROMPT_DATA
         
-        result = self.prompt_manager.get_example_output("test")
+        result = prompt_manager.get_example_output("test")
         
         assert result == {"test": "example"}
-        mock_load.assert_called_once_with("test_prompt")
+        assert patched_load.calls == ["test_prompt"]
     
-    @patch.object(PromptManager, 'load_prompt')
-    def test_get_example_output_not_found(self, mock_load):
+    def test_get_example_output_not_found(self, patched_load, prompt_manager):
         """Test example output when not available."""
-        mock_load.return_value = {"agent": "No example"}
+        patched_load.return_value = NO_EXAMPLE_DATA
         
-        result = self.prompt_manager.get_example_output("test")
+        result = prompt_manager.get_example_output("test")
         
         assert result is None
     
-    @patch.object(PromptManager, 'load_prompt')
-    def test_get_example_output_error(self, mock_load):
+    def test_get_example_output_error(self, patched_load, prompt_manager):
         """Test example output on error."""
-        mock_load.side_effect = Exception("Test error")
+        patched_load.side_effect = Exception("Test error")
         
-        result = self.prompt_manager.get_example_output("test")
+        result = prompt_manager.get_example_output("test")
         
         assert result is None
     
-    def test_clear_cache(self):
+    def test_clear_cache(self, prompt_manager):
         """Test cache clearing."""
-        self.prompt_manager._cache["test"] = {"data": "test"}
+        prompt_manager._cache.update({"test": {"data": "test"}})
         
-        self.prompt_manager.clear_cache()
+        prompt_manager.clear_cache()
         
-        assert self.prompt_manager._cache == {}
+        assert prompt_manager._cache == {}
+
+
+@pytest.fixture(scope="class")
+def mock_manager():
+    """Swap the global prompt manager for a mock once for the whole class."""
+    with pytest.MonkeyPatch.context() as mp:
+        mock = MagicMock()
+        mp.setattr("src.prompts.prompt_manager", mock)
+        yield mock
 
 
 class TestConvenienceFunctions:
     """Test convenience functions."""
     
-    @patch('src.prompts.prompt_manager')
+    @pytest.fixture(autouse=True)
+    def _reset_mock(self, mock_manager):
+        """Clear recorded calls between tests."""
+        mock_manager.reset_mock()
+    
     def test_get_agent_prompt(self, mock_manager):
         """Test get_agent_prompt convenience function."""
         mock_manager.get_system_prompt.return_value = "Test prompt"
@@ -230,7 +237,6 @@ class TestConvenienceFunctions:
         assert result == "Test prompt"
         mock_manager.get_system_prompt.assert_called_once_with("cardiologist")
     
-    @patch('src.prompts.prompt_manager')
     def test_get_ocr_prompt_function(self, mock_manager):
         """Test get_ocr_prompt convenience function."""
         mock_manager.get_ocr_prompt.return_value = "OCR prompt"
@@ -240,7 +246,6 @@ class TestConvenienceFunctions:
         assert result == "OCR prompt"
         mock_manager.get_ocr_prompt.assert_called_once()
     
-    @patch('src.prompts.prompt_manager')
     def test_get_entities_prompt_function(self, mock_manager):
         """Test get_entities_prompt convenience function."""
         mock_manager.get_entities_prompt.return_value = "Entities prompt"
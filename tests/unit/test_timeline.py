@@ -1,273 +1,254 @@
 """
 Unit tests for timeline endpoints.
 """
+import sys
+
+import orjson
 import pytest
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from unittest.mock import AsyncMock, patch
-from fastapi.testclient import TestClient
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional
+from fastapi import FastAPI, HTTPException
+from httpx import AsyncClient, ASGITransport
 
+from src.agents.timeline_builder_agent import TimelineBuilder
 from src.api.v1.endpoints.timeline import router
+from src.auth.dependencies import get_current_user_dependency
 from src.utils.schema import TimelineEvent, TimelineResponse
 
+_NOW = datetime(2024, 1, 1, 12, 0, 0)
+_TOMORROW_ISO = (_NOW + timedelta(days=1)).isoformat()
+
+# MongoDB hands back datetimes; the endpoint serialises them itself.
+_TIMELINE_EVENTS_MONGO = (
+    {
+        "_id": "test-event-1",
+        "event_type": "medical",
+        "title": "Blood Test",
+        "description": "Routine blood work",
+        "timestamp": _NOW,
+        "severity": "medium",
+        "metadata": {}
+    },
+)
+
+_TIMELINE_EVENTS_NEO4J = (
+    {
+        "id": "test-event-2",
+        "type": "medical",
+        "title": "Cardiology Visit",
+        "description": "Routine cardiology checkup",
+        "timestamp": _TOMORROW_ISO,
+        "severity": "medium",
+        "properties": {"affected_body_parts": ["heart"]}
+    },
+)
+
+_TIMELINE_SUMMARY = {
+    "event_count": 2,
+    "summary": "Two routine checkups",
+    "key_insights": []
+}
+
+_CREATE_FORM = {
+    "event_type": "medical",
+    "title": "Test Event",
+    "description": "Test event description",
+    "severity": "medium"
+}
+
+
+def _configure_get(mocks):
+    mocks.mongo.get_timeline_events.return_value = _TIMELINE_EVENTS_MONGO
+    mocks.graph.get_patient_timeline.return_value = _TIMELINE_EVENTS_NEO4J
+
+
+def _check_get(data, mocks):
+    assert data["patient_id"] == "test-user"
+    assert data["total_events"] == 2
+    assert data["timeline_period"] == "All time"
+    # Most recent first, merged across both stores
+    assert [e["event_id"] for e in data["events"]] == ["test-event-2", "test-event-1"]
+    assert [e["source"] for e in data["events"]] == ["neo4j", "mongodb"]
+    assert mocks.mongo.get_timeline_events.calls == [(("test-user", 10), {})]
+    assert mocks.graph.get_patient_timeline.calls == [(("test-user", 10), {})]
+
+
+def _configure_create(mocks):
+    mocks.mongo.store_timeline_event.return_value = "test-event-id"
+
+
+def _check_create(data, mocks):
+    assert data["event_id"] == "test-event-id"
+    assert data["message"] == "Timeline event created successfully"
+    assert data["event_type"] == "medical"
+    [(args, _kwargs)] = mocks.mongo.store_timeline_event.calls
+    assert args[0] == "test-user"
+    assert args[1]["title"] == "Test Event"
+    # Medical events are mirrored into the knowledge graph
+    assert len(mocks.graph.create_medical_event.calls) == 1
+
+
+def _configure_summary(mocks):
+    mocks.builder.generate_timeline_summary.return_value = _TIMELINE_SUMMARY
+
+
+def _check_summary(data, mocks):
+    assert data["success"] is True
+    assert data["patient_id"] == "test-user"
+    assert data["analysis_period_days"] == 30
+    assert data["summary"] == "Two routine checkups"
+    assert data["event_count"] == 2
+    assert mocks.builder.generate_timeline_summary.calls == [
+        ((), {"patient_id": "test-user", "body_part": None, "time_period_days": 30})
+    ]
+
+
+@dataclass(frozen=True)
+class _Scenario:
+    """One timeline request: mock setup, request spec and expected outcome."""
+    configure: Callable[[Any], None]
+    method: str
+    url: str
+    status: int
+    check: Callable[[Dict[str, Any], Any], None]
+    params: Optional[Dict[str, Any]] = None
+    data: Optional[Dict[str, Any]] = None
+
+
+_SCENARIOS = [
+    pytest.param(_Scenario(_configure_get, "GET", "/timeline", 200, _check_get,
+                           params={"limit": 10}),
+                 id="get_timeline"),
+    pytest.param(_Scenario(_configure_create, "POST", "/timeline", 200, _check_create,
+                           data=_CREATE_FORM),
+                 id="create_event"),
+    pytest.param(_Scenario(_configure_summary, "GET", "/summary", 200, _check_summary,
+                           params={"time_period_days": 30}),
+                 id="summary"),
+]
+
+
+_CURRENT_USER = SimpleNamespace(patient_id="test-user")
+
+
+def _route_endpoint(path, method):
+    """Return the handler the timeline router registers for path and method."""
+    return next(
+        route.endpoint for route in router.routes
+        if route.path == path and method in route.methods
+    )
+
+
+class _Stub:
+    """Callable that records each call and returns a canned value."""
+
+    def __init__(self, return_value=None):
+        self.return_value = return_value
+        self.calls = []
+
+    def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        return self.return_value
+
+
+class _AsyncStub(_Stub):
+    """Awaitable variant of _Stub for the async MongoDB methods."""
+
+    async def __call__(self, *args, **kwargs):
+        return super().__call__(*args, **kwargs)
+
+
+def _make_mongo_client():
+    """Build a MongoDB client stub with only the timeline methods; MongoDB is async."""
+    return SimpleNamespace(get_timeline_events=_AsyncStub(), store_timeline_event=_AsyncStub())
+
+
+def _make_neo4j_client():
+    """Build a Neo4j client stub; Neo4jDB is synchronous."""
+    return SimpleNamespace(get_patient_timeline=_Stub(), create_medical_event=_Stub())
+
+
+@pytest.fixture
+def mocks(monkeypatch):
+    """Install DB client, summary-builder and audit-log stubs for the timeline endpoints."""
+    # src.api.v1.endpoints re-exports the router as `timeline`, so patch the
+    # module object rather than a dotted string target.
+    timeline_module = sys.modules["src.api.v1.endpoints.timeline"]
+    stubs = SimpleNamespace(
+        mongo=_make_mongo_client(),
+        graph=_make_neo4j_client(),
+        builder=SimpleNamespace(generate_timeline_summary=_AsyncStub()),
+        log=_Stub(),
+    )
+    
+    async def _get_mongo():
+        return stubs.mongo
+    
+    monkeypatch.setattr(timeline_module, "get_mongo", _get_mongo)
+    monkeypatch.setattr(timeline_module, "get_graph", lambda: stubs.graph)
+    monkeypatch.setattr(timeline_module, "log_user_action", stubs.log)
+    # The summary endpoint imports TimelineBuilder at call time, from its own module.
+    monkeypatch.setattr(sys.modules[TimelineBuilder.__module__], "TimelineBuilder", _Stub(stubs.builder))
+    return stubs
+
+
+@pytest.fixture(scope="session")
+def timeline_app():
+    """Bare app that mounts only the timeline router, authenticated as _CURRENT_USER."""
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_current_user_dependency] = lambda: _CURRENT_USER
+    return app
+
+
+@pytest.fixture
+async def timeline_async_client(timeline_app):
+    """httpx client that dispatches straight into the app on the test's loop."""
+    async with AsyncClient(transport=ASGITransport(app=timeline_app), base_url="http://test") as client:
+        yield client
+
 
 class TestTimelineEndpoints:
     """Test cases for timeline endpoints."""
 
-    @patch('src.api.endpoints.timeline.get_mongo')
-    @patch('src.api.endpoints.timeline.get_graph')
-    @patch('src.api.endpoints.timeline.log_user_action')
-    async def test_get_timeline_success(self, mock_log, mock_graph, mock_mongo):
-        """Test successful timeline retrieval."""
-        # Mock database responses
-        mock_mongo_client = AsyncMock()
-        mock_mongo_client.get_timeline_events.return_value = [
-            {
-                "event_id": "test-event-1",
-                "event_type": "medical",
-                "title": "Blood Test",
-                "description": "Routine blood work",
-                "timestamp": "2024-01-01T10:00:00Z",
-                "severity": "medium",
-                "metadata": {}
-            }
-        ]
-        mock_mongo.return_value = mock_mongo_client
-        
-        mock_neo4j_client = AsyncMock()
-        mock_neo4j_client.get_patient_timeline.return_value = [
-            {
-                "event_id": "test-event-2",
-                "event_type": "medical",
-                "title": "Cardiology Visit",
-                "description": "Routine cardiology checkup",
-                "timestamp": "2024-01-02T14:00:00Z",
-                "severity": "medium",
-                "affected_body_parts": ["heart"]
-            }
-        ]
-        mock_graph.return_value = mock_neo4j_client
-        
-        # Test the endpoint
-        from fastapi import FastAPI
-        app = FastAPI()
-        app.include_router(router)
-        
-        with TestClient(app) as client:
-            response = client.get("/timeline/?user_id=test-user&limit=10")
-            
-            assert response.status_code == 200
-            data = response.json()
-            
-            assert "events" in data
-            assert "total_count" in data
-            assert "date_range" in data
-            assert len(data["events"]) == 2
-            
-            # Verify mock calls
-            mock_mongo_client.get_timeline_events.assert_called_once_with("test-user", 10)
-            mock_neo4j_client.get_patient_timeline.assert_called_once_with("test-user", 10)
-            mock_log.assert_called_once()
-
-    @patch('src.api.endpoints.timeline.get_mongo')
-    @patch('src.api.endpoints.timeline.log_user_action')
-    async def test_create_timeline_event_success(self, mock_log, mock_mongo):
-        """Test successful timeline event creation."""
-        mock_mongo_client = AsyncMock()
-        mock_mongo_client.store_timeline_event.return_value = "test-event-id"
-        mock_mongo.return_value = mock_mongo_client
+    @pytest.mark.parametrize("scenario", _SCENARIOS)
+    async def test_timeline_endpoints_matrix(self, mocks, timeline_async_client, scenario):
+        """Test each timeline endpoint scenario against fresh DB stubs."""
+        scenario.configure(mocks)
         
-        from fastapi import FastAPI
-        app = FastAPI()
-        app.include_router(router)
+        response = await timeline_async_client.request(
+            scenario.method, scenario.url, params=scenario.params, data=scenario.data
+        )
         
-        with TestClient(app) as client:
-            response = client.post("/timeline/event", params={
-                "user_id": "test-user",
-                "event_type": "medical",
-                "title": "Test Event",
-                "description": "Test event description",
-                "severity": "medium"
-            })
-            
-            assert response.status_code == 200
-            data = response.json()
-            
-            assert data["event_id"] == "test-event-id"
-            assert data["message"] == "Timeline event created successfully"
-            assert data["event_type"] == "medical"
-            
-            # Verify mock calls
-            mock_mongo_client.store_timeline_event.assert_called_once()
-            mock_log.assert_called_once()
-
-    @patch('src.api.endpoints.timeline.get_mongo')
-    @patch('src.api.endpoints.timeline.log_user_action')
-    async def test_delete_timeline_event_success(self, mock_log, mock_mongo):
-        """Test successful timeline event deletion."""
-        mock_mongo_client = AsyncMock()
-        mock_mongo_client.get_timeline_event.return_value = {
-            "event_id": "test-event-id",
+        assert response.status_code == scenario.status
+        scenario.check(orjson.loads(response.content), mocks)
+
+    @pytest.mark.parametrize("method,kwargs,detail", [
+        ("GET", {
+            "start_date": "invalid-date",
+            "end_date": None,
+            "event_types": None,
+            "limit": 50
+        }, "Invalid start_date format"),
+        ("POST", {
             "event_type": "medical",
-            "title": "Test Event"
-        }
-        mock_mongo_client.delete_timeline_event.return_value = True
-        mock_mongo.return_value = mock_mongo_client
-        
-        from fastapi import FastAPI
-        app = FastAPI()
-        app.include_router(router)
-        
-        with TestClient(app) as client:
-            response = client.delete("/timeline/event/test-event-id?user_id=test-user")
-            
-            assert response.status_code == 200
-            data = response.json()
-            
-            assert data["message"] == "Timeline event deleted successfully"
-            assert data["event_id"] == "test-event-id"
-            
-            # Verify mock calls
-            mock_mongo_client.get_timeline_event.assert_called_once_with("test-user", "test-event-id")
-            mock_mongo_client.delete_timeline_event.assert_called_once_with("test-user", "test-event-id")
-            mock_log.assert_called_once()
-
-    @patch('src.api.endpoints.timeline.get_mongo')
-    async def test_delete_timeline_event_not_found(self, mock_mongo):
-        """Test timeline event deletion when event not found."""
-        mock_mongo_client = AsyncMock()
-        mock_mongo_client.get_timeline_event.return_value = None
-        mock_mongo.return_value = mock_mongo_client
-        
-        from fastapi import FastAPI
-        app = FastAPI()
-        app.include_router(router)
-        
-        with TestClient(app) as client:
-            response = client.delete("/timeline/event/nonexistent-id?user_id=test-user")
-            
-            assert response.status_code == 404
-            data = response.json()
-            assert "Timeline event not found" in data["detail"]
-
-    @patch('src.api.endpoints.timeline.get_mongo')
-    @patch('src.api.endpoints.timeline.log_user_action')
-    async def test_get_timeline_summary_success(self, mock_log, mock_mongo):
-        """Test successful timeline summary generation."""
-        mock_mongo_client = AsyncMock()
-        mock_mongo_client.get_timeline_events.return_value = [
-            {
-                "event_type": "medical",
-                "severity": "medium",
-                "timestamp": datetime.utcnow().isoformat()
-            },
-            {
-                "event_type": "lifestyle",
-                "severity": "low",
-                "timestamp": (datetime.utcnow() - timedelta(days=1)).isoformat()
-            }
-        ]
-        mock_mongo.return_value = mock_mongo_client
-        
-        from fastapi import FastAPI
-        app = FastAPI()
-        app.include_router(router)
-        
-        with TestClient(app) as client:
-            response = client.get("/timeline/summary?user_id=test-user&days=30")
-            
-            assert response.status_code == 200
-            data = response.json()
-            
-            assert "period" in data
-            assert "total_events" in data
-            assert "event_types" in data
-            assert "severity_distribution" in data
-            assert "daily_activity" in data
-            assert "trends" in data
-            
-            assert data["total_events"] == 2
-            assert "medical" in data["event_types"]
-            assert "lifestyle" in data["event_types"]
-            
-            # Verify mock calls
-            mock_mongo_client.get_timeline_events.assert_called_once_with("test-user", limit=1000)
-            mock_log.assert_called_once()
-
-    @patch('src.api.endpoints.timeline.get_mongo')
-    @patch('src.api.endpoints.timeline.log_user_action')
-    async def test_search_timeline_events_success(self, mock_log, mock_mongo):
-        """Test successful timeline event search."""
-        mock_mongo_client = AsyncMock()
-        mock_mongo_client.get_timeline_events.return_value = [
-            {
-                "event_type": "medical",
-                "title": "Blood Test",
-                "description": "Routine blood work",
-                "severity": "medium",
-                "timestamp": datetime.utcnow().isoformat()
-            },
-            {
-                "event_type": "lifestyle", 
-                "title": "Exercise",
-                "description": "Morning run",
-                "severity": "low",
-                "timestamp": (datetime.utcnow() - timedelta(days=1)).isoformat()
-            }
-        ]
-        mock_mongo.return_value = mock_mongo_client
-        
-        from fastapi import FastAPI
-        app = FastAPI()
-        app.include_router(router)
-        
-        with TestClient(app) as client:
-            response = client.get("/timeline/search?user_id=test-user&event_type=medical&search_term=blood")
-            
-            assert response.status_code == 200
-            data = response.json()
-            
-            assert "events" in data
-            assert "total_found" in data
-            assert "returned" in data
-            assert "filters_applied" in data
-            
-            # Should only return the medical event with "blood" in title
-            assert data["returned"] == 1
-            assert data["events"][0]["event_type"] == "medical"
-            assert "blood" in data["events"][0]["title"].lower()
-            
-            # Verify mock calls
-            mock_mongo_client.get_timeline_events.assert_called_once_with("test-user", limit=1000)
-            mock_log.assert_called_once()
-
-    def test_get_timeline_invalid_date_format(self):
-        """Test timeline retrieval with invalid date format."""
-        from fastapi import FastAPI
-        app = FastAPI()
-        app.include_router(router)
+            "title": "Test Event",
+            "description": "Test description",
+            "timestamp": "invalid-timestamp",
+            "severity": "medium",
+            "metadata": None
+        }, "Invalid timestamp format"),
+    ])
+    async def test_invalid_input(self, method, kwargs, detail):
+        """Test timeline handlers reject malformed dates before touching any DB."""
+        # Call the handler directly; the 400 is raised before any I/O, so the
+        # HTTP round trip adds nothing. Query/Form defaults must be explicit.
+        endpoint = _route_endpoint("/timeline", method)
         
-        with TestClient(app) as client:
-            response = client.get("/timeline/?user_id=test-user&start_date=invalid-date")
-            
-            assert response.status_code == 400
-            data = response.json()
-            assert "Invalid start_date format" in data["detail"]
-
-    def test_create_timeline_event_invalid_timestamp(self):
-        """Test timeline event creation with invalid timestamp."""
-        from fastapi import FastAPI
-        app = FastAPI()
-        app.include_router(router)
+        with pytest.raises(HTTPException) as exc_info:
+            await endpoint(current_user=_CURRENT_USER, **kwargs)
         
-        with TestClient(app) as client:
-            response = client.post("/timeline/event", params={
-                "user_id": "test-user",
-                "event_type": "medical",
-                "title": "Test Event",
-                "description": "Test description",
-                "timestamp": "invalid-timestamp"
-            })
-            
-            assert response.status_code == 400
-            data = response.json()
-            assert "Invalid timestamp format" in data["detail"]
+        assert exc_info.value.status_code == 400
+        assert detail in exc_info.value.detail